@@ -5,7 +5,7 @@
 ########################################################################
 
 import sys, os, os.path, urllib.parse, datetime, re, hashlib, base64
-import ipaddress
+import ipaddress, multiprocessing.pool
 import rtyaml
 import dns.resolver
 
@@ -16,7 +16,12 @@ from ssl_certificates import get_ssl_certificates, check_certificate
 # This regular expression matches domain names according to RFCs, it also accepts fqdn with an leading dot,
 # underscores, as well as asteriks which are allowed in domain names but not hostnames (i.e. allowed in
 # DNS but not in URLs), which are common in certain record types like for DKIM.
-DOMAIN_RE = "^(?!\-)(?:[*][.])?(?:[a-zA-Z\d\-_]{0,62}[a-zA-Z\d_]\.){1,126}(?!\d+)[a-zA-Z\d_]{1,63}(\.?)$"
+DOMAIN_RE = re.compile("^(?!\-)(?:[*][.])?(?:[a-zA-Z\d\-_]{0,62}[a-zA-Z\d_]\.){1,126}(?!\d+)[a-zA-Z\d_]{1,63}(\.?)$")
+
+# Patterns used each time the zones are built, compiled once here rather
+# than looked up in re's cache on every call for every domain.
+RRSIG_SOA_EXPIRATION_RE = re.compile(r"\sRRSIG\s+SOA\s+\d+\s+\d+\s\d+\s+(\d{14})")
+SERIAL_RE = re.compile(r"(\d+)\s*;\s*serial number")
 
 def get_dns_domains(env):
 	# Add all domain names in use by email users and mail aliases, any
@@ -56,38 +61,27 @@ def get_dns_zones(env):
 	# stable order so we don't rewrite the file & restart the service
 	# meaninglessly.
 	zone_order = sort_domains([ zone[0] for zone in zonefiles ], env)
-	zonefiles.sort(key = lambda zone : zone_order.index(zone[0]) )
+	zone_order = { domain: i for i, domain in enumerate(zone_order) }
+	zonefiles.sort(key = lambda zone : zone_order[zone[0]] )
 
 	return zonefiles
 
 def do_dns_update(env, force=False):
 	# Write zone files.
 	os.makedirs('/etc/nsd/zones', exist_ok=True)
-	zonefiles = []
-	updated_domains = []
-	for (domain, zonefile, records) in build_zones(env):
-		# The final set of files will be signed.
-		zonefiles.append((domain, zonefile + ".signed"))
+	zones = list(build_zones(env))
 
-		# See if the zone has changed, and if so update the serial number
-		# and write the zone file.
-		if not write_nsd_zone(domain, "/etc/nsd/zones/" + zonefile, records, env, force):
-			# Zone was not updated. There were no changes.
-			continue
+	# The final set of files will be signed.
+	zonefiles = [(domain, zonefile + ".signed") for domain, zonefile, records in zones]
 
-		# Mark that we just updated this domain.
-		updated_domains.append(domain)
+	# Write and sign each zone. The zones are independent of each other and
+	# most of the time is spent waiting on ldns-signzone, so process them
+	# on a pool of threads. starmap() returns results in the order of zones.
+	with multiprocessing.pool.ThreadPool(processes=10) as pool:
+		zone_updated = pool.starmap(update_zone, [(domain, zonefile, records, env, force) for domain, zonefile, records in zones])
 
-		# Sign the zone.
-		#
-		# Every time we sign the zone we get a new result, which means
-		# we can't sign a zone without bumping the zone's serial number.
-		# Thus we only sign a zone if write_nsd_zone returned True
-		# indicating the zone changed, and thus it got a new serial number.
-		# write_nsd_zone is smart enough to check if a zone's signature
-		# is nearing expiration and if so it'll bump the serial number
-		# and return True so we get a chance to re-sign it.
-		sign_zone(domain, zonefile, env)
+	# Mark which domains we just updated.
+	updated_domains = [zone[0] for zone, updated in zip(zones, zone_updated) if updated]
 
 	# Write the main nsd.conf file.
 	if write_nsd_conf(zonefiles, list(get_custom_dns_config(env)), env):
@@ -97,7 +91,8 @@ def do_dns_update(env, force=False):
 			updated_domains.append("DNS configuration")
 
 	# Tell nsd to reload changed zone files.
-	if len(updated_domains) > 0:
+	dns_updated = len(updated_domains) > 0
+	if dns_updated:
 		# 'reconfig' is needed if there are added or removed zones, but
 		# it may not reload existing zones, so we call 'reload' too. If
 		# nsd isn't running, nsd-control fails, so in that case revert
@@ -112,15 +107,23 @@ def do_dns_update(env, force=False):
 	# Write the OpenDKIM configuration tables for all of the mail domains.
 	from mailconfig import get_mail_domains
 	if write_opendkim_tables(get_mail_domains(env), env):
-		# Settings changed. Kick opendkim.
-		shell('check_call', ["/usr/sbin/service", "opendkim", "restart"])
+		# Settings changed. Kick opendkim. A reload makes opendkim re-read its
+		# configuration and tables without dropping connections from postfix.
+		# If opendkim isn't running, the reload fails, so in that case revert
+		# to restarting it.
+		try:
+			shell('check_call', ["/usr/sbin/service", "opendkim", "reload"])
+		except:
+			shell('check_call', ["/usr/sbin/service", "opendkim", "restart"])
 		if len(updated_domains) == 0:
 			# If this is the only thing that changed?
 			updated_domains.append("OpenDKIM configuration")
 
-	# Clear bind9's DNS cache so our own DNS resolver is up to date.
+	# Clear bind9's DNS cache so our own DNS resolver is up to date. If none
+	# of our zones changed there is nothing stale to clear.
 	# (ignore errors with trap=True)
-	shell('check_call', ["/usr/sbin/rndc", "flush"], trap=True)
+	if dns_updated:
+		shell('check_call', ["/usr/sbin/rndc", "flush"], trap=True)
 
 	if len(updated_domains) == 0:
 		# if nothing was updated (except maybe OpenDKIM's files), don't show any output
@@ -169,13 +172,17 @@ def build_zones(env):
 	# Load custom records to add to zones.
 	additional_records = list(get_custom_dns_config(env))
 
+	# The DKIM record is the same for every mail domain. Read it now rather
+	# than repeatedly for each domain.
+	dkim_record = get_dkim_record(env)
+
 	# Build DNS records for each zone.
 	for domain, zonefile in zonefiles:
 		# Build the records to put in the zone.
-		records = build_zone(domain, domains, additional_records, env)
+		records = build_zone(domain, domains, additional_records, dkim_record, env)
 		yield (domain, zonefile, records)
 
-def build_zone(domain, domain_properties, additional_records, env, is_zone=True):
+def build_zone(domain, domain_properties, additional_records, dkim_record, env, is_zone=True):
 	records = []
 
 	# For top-level zones, define the authoritative name servers.
@@ -221,7 +228,7 @@ def build_zone(domain, domain_properties, additional_records, env, is_zone=True)
 		subdomains = [d for d in domain_properties if d.endswith("." + domain)]
 		for subdomain in subdomains:
 			subdomain_qname = subdomain[0:-len("." + domain)]
-			subzone = build_zone(subdomain, domain_properties, additional_records, env, is_zone=False)
+			subzone = build_zone(subdomain, domain_properties, additional_records, dkim_record, env, is_zone=False)
 			for child_qname, child_rtype, child_value, child_explanation in subzone:
 				if child_qname == None:
 					child_qname = subdomain_qname
@@ -296,13 +303,10 @@ def build_zone(domain, domain_properties, additional_records, env, is_zone=True)
 			records.append((None,  "TXT", 'v=spf1 mx -all', "Recommended. Specifies that only the box is permitted to send @%s mail." % domain))
 
 		# Append the DKIM TXT record to the zone as generated by OpenDKIM.
-		# Skip if the user has set a DKIM record already.
-		opendkim_record_file = os.path.join(env['STORAGE_ROOT'], 'mail/dkim/mail.txt')
-		with open(opendkim_record_file) as orf:
-			m = re.match(r'(\S+)\s+IN\s+TXT\s+\( ((?:"[^"]+"\s+)+)\)', orf.read(), re.S)
-			val = "".join(re.findall(r'"([^"]+)"', m.group(2)))
-			if not has_rec(m.group(1), "TXT", prefix="v=DKIM1; "):
-				records.append((m.group(1), "TXT", val, "Recommended. Provides a way for recipients to verify that this machine sent @%s mail." % domain))
+		# Skip if the user has set a DKIM record already, or if there is no
+		# DKIM key (see write_opendkim_tables).
+		if dkim_record is not None and not has_rec(dkim_record[0], "TXT", prefix="v=DKIM1; "):
+			records.append((dkim_record[0], "TXT", dkim_record[1], "Recommended. Provides a way for recipients to verify that this machine sent @%s mail." % domain))
 
 		# Append a DMARC record.
 		# Skip if the user has set a DMARC record already.
@@ -383,6 +387,29 @@ def build_zone(domain, domain_properties, additional_records, env, is_zone=True)
 
 	return records
 
+def get_dkim_record(env):
+	# Parse the DKIM TXT record generated by OpenDKIM into its qname and
+	# its value, with the quoted strings of the value concatenated. Returns
+	# None if OpenDKIM has not generated a key (just try to open the file
+	# rather than checking first that it exists).
+	opendkim_record_file = os.path.join(env['STORAGE_ROOT'], 'mail/dkim/mail.txt')
+	try:
+		with open(opendkim_record_file) as orf:
+			record = orf.read()
+	except FileNotFoundError:
+		return None
+
+	# The file looks like:
+	#   mail._domainkey	IN	TXT	( "v=DKIM1; h=sha256; k=rsa; "
+	#   	  "p=..." )  ; ----- DKIM key mail for example.com
+	# The qname is the first field and the value is the quoted strings
+	# within the parentheses. Plain string operations are enough for this
+	# and are linear in the length of the record (unlike a regex with
+	# nested repetition, which can backtrack on malformed input).
+	qname = record.split(None, 1)[0]
+	value = record[record.index("(") + 1:record.index(")")]
+	return (qname, "".join(value.split('"')[1::2]))
+
 def is_domain_cert_signed_and_valid(domain, env):
 	cert = get_ssl_certificates(env).get(domain)
 	if not cert: return False # no certificate provisioned
@@ -484,6 +511,29 @@ def build_sshfp_records():
 
 ########################################################################
 
+def update_zone(domain, zonefile, records, env, force):
+	# Form the path to the zone file once. write_nsd_zone and sign_zone
+	# both take the full path.
+	zonefile = "/etc/nsd/zones/" + zonefile
+
+	# See if the zone has changed, and if so update the serial number
+	# and write the zone file.
+	if not write_nsd_zone(domain, zonefile, records, env, force):
+		# Zone was not updated. There were no changes.
+		return False
+
+	# Sign the zone.
+	#
+	# Every time we sign the zone we get a new result, which means
+	# we can't sign a zone without bumping the zone's serial number.
+	# Thus we only sign a zone if write_nsd_zone returned True
+	# indicating the zone changed, and thus it got a new serial number.
+	# write_nsd_zone is smart enough to check if a zone's signature
+	# is nearing expiration and if so it'll bump the serial number
+	# and return True so we get a chance to re-sign it.
+	sign_zone(domain, zonefile, env)
+	return True
+
 def write_nsd_zone(domain, zonefile, records, env, force):
 	# On the $ORIGIN line, there's typically a ';' comment at the end explaining
 	# what the $ORIGIN line does. Any further data after the domain confuses
@@ -512,29 +562,27 @@ $TTL 86400          ; default time to live
            )
 """
 
-	# Replace replacement strings.
-	zone = zone.format(domain=domain, primary_domain=env["PRIMARY_HOSTNAME"])
+	# Replace replacement strings. The zone is built up as a list of
+	# strings and joined once at the end rather than concatenated
+	# record-by-record, which is quadratic in the size of the zone.
+	zone = [zone.format(domain=domain, primary_domain=env["PRIMARY_HOSTNAME"])]
 
 	# Add records.
 	for subdomain, querytype, value, explanation in records:
-		if subdomain:
-			zone += subdomain
-		zone += "\tIN\t" + querytype + "\t"
 		if querytype == "TXT":
 			# Divide into 255-byte max substrings.
-			v2 = ""
-			while len(value) > 0:
-				s = value[0:255]
-				value = value[255:]
+			v2 = []
+			for i in range(0, len(value), 255):
+				s = value[i:i+255]
 				s = s.replace('\\', '\\\\') # escape backslashes
 				s = s.replace('"', '\\"') # escape quotes
-				s = '"' + s + '"' # wrap in quotes
-				v2 += s + " "
-			value = v2
-		zone += value + "\n"
+				v2.append('"' + s + '" ') # wrap in quotes
+			value = "".join(v2)
+		zone.append((subdomain or "") + "\tIN\t" + querytype + "\t" + value + "\n")
 
 	# Append a stable hash of DNSSEC signing keys in a comment.
-	zone += "\n; DNSSEC signing keys hash: {}\n".format(hash_dnssec_keys(domain, env))
+	zone.append("\n; DNSSEC signing keys hash: {}\n".format(hash_dnssec_keys(domain, env)))
+	zone = "".join(zone)
 
 	# DNSSEC requires re-signing a zone periodically. That requires
 	# bumping the serial number even if no other records have changed.
@@ -552,7 +600,7 @@ $TTL 86400          ; default time to live
 		# number so we can re-sign it.
 		with open(zonefile + ".signed") as f:
 			signed_zone = f.read()
-		expiration_times = re.findall(r"\sRRSIG\s+SOA\s+\d+\s+\d+\s\d+\s+(\d{14})", signed_zone)
+		expiration_times = RRSIG_SOA_EXPIRATION_RE.findall(signed_zone)
 		if len(expiration_times) == 0:
 			# weird
 			force_bump = True
@@ -569,14 +617,26 @@ $TTL 86400          ; default time to live
 	if os.path.exists(zonefile):
 		# If the zone already exists, is different, and has a later serial number,
 		# increment the number.
-		with open(zonefile) as f:
-			existing_zone = f.read()
-			m = re.search(r"(\d+)\s*;\s*serial number", existing_zone)
+		#
+		# The serial number is in the SOA record, which is always within the
+		# first few hundred bytes of the file.
+		soa_size = 4096
+		with open(zonefile, "rb") as f:
+			# The serial number takes as many characters as __SERIAL__, so if the
+			# file's size differs from the new zone's then the zone has changed and
+			# we only need the serial number from the SOA record at the top of the
+			# file. Don't bother reading the rest of it.
+			if os.fstat(f.fileno()).st_size == len(zone.encode("utf8")):
+				existing_zone = f.read()
+			else:
+				existing_zone = f.read(soa_size)
+			existing_zone = existing_zone.decode("utf8", errors="replace")
+			m = SERIAL_RE.search(existing_zone, 0, soa_size)
 			if m:
 				# Clear out the serial number in the existing zone file for the
 				# purposes of seeing if anything *else* in the zone has changed.
 				existing_serial = m.group(1)
-				existing_zone = existing_zone.replace(m.group(0), "__SERIAL__     ; serial number")
+				existing_zone = existing_zone[:m.start(1)] + "__SERIAL__" + existing_zone[m.end(1):]
 
 				# If the existing zone is the same as the new zone (modulo the serial number),
 				# there is no need to update the file. Unless we're forcing a bump.
@@ -590,11 +650,14 @@ $TTL 86400          ; default time to live
 				if existing_serial >= serial:
 					serial = str(int(existing_serial) + 1)
 
-	zone = zone.replace("__SERIAL__", serial)
+	zone = zone.replace("__SERIAL__", serial, 1)
 
-	# Write the zone file.
-	with open(zonefile, "w") as f:
-		f.write(zone)
+	# Write the zone file in a single write. Write it to a temporary file
+	# first and then move it into place, so that if we're interrupted nsd
+	# is never left with a partially written zone.
+	with open(zonefile + ".tmp", "wb") as f:
+		f.write(zone.encode("utf8"))
+	os.replace(zonefile + ".tmp", zonefile)
 
 	return True # file is updated
 
@@ -614,34 +677,58 @@ def get_dns_zonefile(zone, env):
 def write_nsd_conf(zonefiles, additional_records, env):
 	# Write the list of zones to a configuration file.
 	nsd_conf_file = "/etc/nsd/nsd.conf.d/zones.conf"
-	nsdconf = ""
 
-	# Append the zones.
+	# If custom secondary nameservers have been set, allow zone transfers
+	# and, if not a subnet, notifies to them. They are the same for every
+	# zone, so resolve their hostnames and build these lines once here
+	# rather than again for each zone.
+	xfr_lines = []
+	for ipaddr in get_secondary_dns(additional_records, mode="xfr"):
+		if "/" not in ipaddr:
+			xfr_lines.append("\n\tnotify: %s NOKEY" % (ipaddr))
+		xfr_lines.append("\n\tprovide-xfr: %s NOKEY\n" % (ipaddr))
+	xfr_lines = "".join(xfr_lines)
+
+	# Append the zones. Collect the parts in a list and join them once,
+	# rather than re-copying the whole file for each zone.
+	nsdconf = []
 	for domain, zonefile in zonefiles:
-		nsdconf += """
+		nsdconf.append("""
 zone:
 	name: %s
 	zonefile: %s
-""" % (domain, zonefile)
-
-		# If custom secondary nameservers have been set, allow zone transfers
-		# and, if not a subnet, notifies to them.
-		for ipaddr in get_secondary_dns(additional_records, mode="xfr"):
-			if "/" not in ipaddr:
-				nsdconf += "\n\tnotify: %s NOKEY" % (ipaddr)
-			nsdconf += "\n\tprovide-xfr: %s NOKEY\n" % (ipaddr)
+""" % (domain, zonefile))
+		nsdconf.append(xfr_lines)
+	nsdconf = "".join(nsdconf).encode("utf8")
 
 	# Check if the file is changing. If it isn't changing,
-	# return False to flag that no change was made.
-	if os.path.exists(nsd_conf_file):
-		with open(nsd_conf_file) as f:
-			if f.read() == nsdconf:
+	# return False to flag that no change was made. Only look
+	# at the existing file if its size says it might be unchanged.
+	# We keep a hash of what we last wrote next to it (nsd only
+	# includes *.conf files), so normally we just read that rather
+	# than the whole file. If there's no hash yet, compare bytes
+	# so the existing file needn't be decoded.
+	nsdconf_hash = hashlib.sha1(nsdconf).hexdigest()
+	if os.path.exists(nsd_conf_file) and os.path.getsize(nsd_conf_file) == len(nsdconf):
+		if os.path.exists(nsd_conf_file + ".hash"):
+			with open(nsd_conf_file + ".hash") as f:
+				if f.read() == nsdconf_hash:
+					return False
+		else:
+			with open(nsd_conf_file, "rb") as f:
+				unchanged = (f.read() == nsdconf)
+			if unchanged:
+				with open(nsd_conf_file + ".hash", "w") as f:
+					f.write(nsdconf_hash)
 				return False
 
 	# Write out new contents and return True to signal that
-	# configuration changed.
-	with open(nsd_conf_file, "w") as f:
+	# configuration changed. Write the hash after the file so
+	# that it never vouches for contents that weren't written.
+	with open(nsd_conf_file, "wb") as f:
 		f.write(nsdconf)
+	with open(nsd_conf_file + ".hash", "w") as f:
+		f.write(nsdconf_hash)
 	return True
 
 ########################################################################
@@ -701,18 +788,17 @@ def sign_zone(domain, zonefile, env):
 		for ext in (".private", ".key"):
 			# Copy the .key and .private files to /tmp to patch them up.
 			#
-			# Use os.umask and open().write() to securely create a copy that only
-			# we (root) can read.
+			# Use os.open with an explicit mode to securely create a copy that only
+			# we (root) can read. (Zones are signed on several threads at once, so
+			# we can't toggle the process-wide umask here.)
 			oldkeyfn = os.path.join(env['STORAGE_ROOT'], 'dns/dnssec', keyfn + ext)
 			with open(oldkeyfn, "r") as fr:
 				keydata = fr.read()
 			keydata = keydata.replace("_domain_", domain)
-			prev_umask = os.umask(0o77) # ensure written file is not world-readable
-			try:
-				with open(newkeyfn + ext, "w") as fw:
-					fw.write(keydata)
-			finally:
-				os.umask(prev_umask) # other files we write should be world-readable
+			if os.path.exists(newkeyfn + ext):
+				os.unlink(newkeyfn + ext) # so the file is re-created with our mode
+			with open(os.open(newkeyfn + ext, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as fw:
+				fw.write(keydata)
 
 		# Put the patched key filename base (without extension) into the list of keys we'll sign with.
 		all_keys.append(newkeyfn)
@@ -728,7 +814,7 @@ def sign_zone(domain, zonefile, env):
 		"-n",
 
 		# zonefile to sign
-		"/etc/nsd/zones/" + zonefile,
+		zonefile,
 	]
 		# keys to sign with (order doesn't matter -- it'll figure it out)
 		+ all_keys
@@ -743,7 +829,7 @@ def sign_zone(domain, zonefile, env):
 	# be used, so we'll pre-generate all for each key. One DS record per line. Only one
 	# needs to actually be deployed at the registrar. We'll select the preferred one
 	# in the status checks.
-	with open("/etc/nsd/zones/" + zonefile + ".ds", "w") as f:
+	with open(zonefile + ".ds", "w") as f:
 		for key in ksk_keys:
 			for digest_type in ('1', '2', '4'):
 				rr_ds = shell('check_output', ["/usr/bin/ldns-key2ds",
@@ -796,14 +882,17 @@ def write_opendkim_tables(domains, env):
 
 	did_update = False
 	for filename, content in config.items():
-		# Don't write the file if it doesn't need an update.
-		if os.path.exists("/etc/opendkim/" + filename):
-			with open("/etc/opendkim/" + filename) as f:
+		content = content.encode("utf8")
+
+		# Don't write the file if it doesn't need an update. As with nsd's
+		# configuration, only read the existing file if its size matches.
+		if os.path.exists("/etc/opendkim/" + filename) and os.path.getsize("/etc/opendkim/" + filename) == len(content):
+			with open("/etc/opendkim/" + filename, "rb") as f:
 				if f.read() == content:
 					continue
 
 		# The contents needs to change.
-		with open("/etc/opendkim/" + filename, "w") as f:
+		with open("/etc/opendkim/" + filename, "wb") as f:
 			f.write(content)
 		did_update = True
 
@@ -918,7 +1007,7 @@ def set_custom_dns_record(qname, rtype, value, action, env):
 	# validate rtype
 	rtype = rtype.upper()
 	if value is not None and qname != "_secondary_nameserver":
-		if not re.search(DOMAIN_RE, qname):
+		if not DOMAIN_RE.search(qname):
 			raise ValueError("Invalid name.")
 
 		if rtype in ("A", "AAAA"):
@@ -934,7 +1023,7 @@ def set_custom_dns_record(qname, rtype, value, action, env):
 			if not value.endswith("."):
 				value = value + "."
 
-			if not re.search(DOMAIN_RE, value):
+			if not DOMAIN_RE.search(value):
 				raise ValueError("Invalid value.")
 		elif rtype in ("CNAME", "TXT", "SRV", "MX", "SSHFP", "CAA"):
 			# anything goes
@@ -1019,20 +1108,35 @@ def get_secondary_dns(custom_dns, mode=None):
 					ipaddress.ip_interface(hostname) # test if it's an IP address or CIDR notation
 					values.append(hostname)
 				except ValueError:
-					try:
-						response = dns.resolver.resolve(hostname+'.', "A", raise_on_no_answer=False)
-						values.extend(map(str, response))
-					except dns.exception.DNSException:
-						pass
-					try:
-						response = dns.resolver.resolve(hostname+'.', "AAAA", raise_on_no_answer=False)
-						values.extend(map(str, response))
-					except dns.exception.DNSException:
-						pass
+					# Queue the lookups, which are done below.
+					values.append([(hostname+'.', "A"), (hostname+'.', "AAAA")])
 
 			else:
 				values.append(hostname)
 
+	# Do the queued lookups. Each is a DNS round trip that is independent
+	# of the others, so run them concurrently on a small pool of threads.
+	lookups = [lookup for value in values if isinstance(value, list) for lookup in value]
+	if len(lookups) > 0:
+		def resolve(lookup):
+			try:
+				response = resolver.resolve(*lookup, raise_on_no_answer=False)
+				return [str(rr) for rr in response]
+			except dns.exception.DNSException:
+				return []
+		with multiprocessing.pool.ThreadPool(processes=min(len(lookups), 8)) as pool:
+			responses = iter(pool.map(resolve, lookups))
+
+		# Put the addresses in place of the queued lookups.
+		resolved = []
+		for value in values:
+			if isinstance(value, list):
+				for lookup in value:
+					resolved.extend(next(responses))
+			else:
+				resolved.append(value)
+		values = resolved
+
 	return values
 
 def set_secondary_dns(hostnames, env):